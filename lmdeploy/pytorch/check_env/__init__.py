@@ -1,24 +1,36 @@
 # Copyright (c) OpenMMLab. All rights reserved.
+import functools
 from logging import Logger
 from typing import List
 
-from lmdeploy.utils import get_logger
+
+@functools.lru_cache(maxsize=1)
+def _logger() -> Logger:
+    """get lmdeploy logger."""
+    from lmdeploy.utils import get_logger
+    return get_logger('lmdeploy')
+
+
+@functools.lru_cache(maxsize=1)
+def _version():
+    """get `packaging.version` module."""
+    from packaging import version
+    return version
+
+
+# red `<mod_name> test failed!` followed by the message.
+_ERR_FMT = '\033[31m<%s> test failed!\n%s\033[0m'
 
 
 def _handle_exception(e: Exception,
                       mod_name: str,
                       logger: Logger,
                       message: str = None):
-    red_color = '\033[31m'
-    reset_color = '\033[0m'
     if message is None:
         message = 'Please ensure it has been installed correctly.'
     logger.debug('Exception', exc_info=1)
-    logger.error(f'{type(e).__name__}: {e}')
-    logger.error(f'{red_color}'
-                 f'<{mod_name}> test failed!\n'
-                 f'{message}'
-                 f'{reset_color}')
+    logger.error('%s: %s', type(e).__name__, e)
+    logger.error(_ERR_FMT, mod_name, message)
     exit(1)
 
 
@@ -27,44 +39,81 @@ def check_env_deeplink(device_type: str):
     try_import_deeplink(device_type)
 
 
+_DEEPLINK_DEVICE_TYPES = frozenset({
+    'ascend',
+    'npu',
+    'maca',
+})
+
+
 def try_import_deeplink(device_type: str):
     """import dlinfer if specific device_type is set."""
-    deeplink_device_type_list = [
-        'ascend',
-        'npu',
-        'maca',
-    ]
-    if device_type in deeplink_device_type_list:
-        logger = get_logger('lmdeploy')
+    if device_type in _DEEPLINK_DEVICE_TYPES:
+        logger = _logger()
         try:
             import dlinfer.framework.lmdeploy_ext  # noqa: F401
         except Exception as e:
             _handle_exception(e, 'PyTorch', logger)
 
 
+# checks that have passed in this process.
+_ENV_CHECKED = {'torch': False, 'triton': False}
+
+
+def _run_add_smoke_test(add_func):
+    """add two small tensors on device with `add_func`."""
+    import torch
+
+    a = torch.tensor([1, 2], device='cuda')
+    b = a.new_tensor([3, 4], device='cuda')
+    c = add_func(a, b)
+    expected = a.new_tensor([4, 6])
+    if not torch.equal(c, expected):
+        raise RuntimeError(f'Expected {expected.tolist()}, '
+                           f'but got {c.tolist()}.')
+
+
 def check_env_torch():
     """check PyTorch environment."""
-    logger = get_logger('lmdeploy')
+    if _ENV_CHECKED['torch']:
+        return
+    logger = _logger()
 
     try:
         logger.debug('Checking <PyTorch> environment.')
-        import torch
-
-        a = torch.tensor([1, 2], device='cuda')
-        b = a.new_tensor([3, 4], device='cuda')
-        c = a + b
-        torch.testing.assert_close(c, a.new_tensor([4, 6]))
+        import operator
+        _run_add_smoke_test(operator.add)
     except Exception as e:
         _handle_exception(e, 'PyTorch', logger)
+    _ENV_CHECKED['torch'] = True
 
 
 MAX_TRITON_VERSION = '3.0.0'
 
 
+@functools.lru_cache(maxsize=None)
+def _parsed_version(ver: str):
+    """parse version constant once."""
+    return _version().parse(ver)
+
+
+def _get_triton_version():
+    """get triton version without importing triton if possible."""
+    from importlib import metadata
+    try:
+        triton_version = metadata.version('triton')
+    except metadata.PackageNotFoundError:
+        # triton might be shipped as another distribution, e.g. pytorch-triton
+        import triton
+        triton_version = triton.__version__
+    return _version().parse(triton_version)
+
+
 def check_env_triton(device: str):
     """check OpenAI Triton environment."""
-    from packaging import version
-    logger = get_logger('lmdeploy')
+    if device != 'cuda' or _ENV_CHECKED['triton']:
+        return
+    logger = _logger()
 
     msg = (
         'Please ensure that your device is functioning properly with <Triton>.\n'  # noqa: E501
@@ -73,17 +122,28 @@ def check_env_triton(device: str):
     try:
         logger.debug('Checking <Triton> environment.')
         import torch
-        import triton
-        triton_version = version.parse(triton.__version__)
-        if triton_version > version.parse(MAX_TRITON_VERSION):
-            logger.warning(
-                f'Engine has not been tested on triton>{MAX_TRITON_VERSION}.')
+        triton_version = _get_triton_version()
+        device_cap = torch.cuda.get_device_capability()
+    except Exception as e:
+        _handle_exception(e, 'Triton', logger, msg)
+
+    # fail fast before importing triton and launching the kernel.
+    TRITON_VER_231 = _parsed_version('2.3.1')
+    if device_cap[0] <= 7:
+        if triton_version <= TRITON_VER_231:
+            err = RuntimeError(
+                'Attention triton kernel does not fully support '
+                'triton<3.0.0 on device with capability<8. '
+                'Please upgrade your triton version.')
+            _handle_exception(err, 'Triton', logger)
+
+    if triton_version > _parsed_version(MAX_TRITON_VERSION):
+        logger.warning(
+            f'Engine has not been tested on triton>{MAX_TRITON_VERSION}.')
 
+    try:
         from .triton_custom_add import custom_add
-        a = torch.tensor([1, 2], device='cuda')
-        b = a.new_tensor([3, 4], device='cuda')
-        c = custom_add(a, b)
-        torch.testing.assert_close(c, a + b)
+        _run_add_smoke_test(custom_add)
     except RuntimeError as e:
         ptxas_error = 'device kernel image is invalid'
         if len(e.args) > 0 and ptxas_error in e.args[0]:
@@ -94,23 +154,12 @@ def check_env_triton(device: str):
         _handle_exception(e, 'Triton', logger, msg)
     except Exception as e:
         _handle_exception(e, 'Triton', logger, msg)
-
-    if device == 'cuda':
-        device_cap = torch.cuda.get_device_capability()
-        TRITON_VER_231 = version.parse('2.3.1')
-
-        if device_cap[0] <= 7:
-            if triton_version <= TRITON_VER_231:
-                err = RuntimeError(
-                    'Attention triton kernel does not fully support '
-                    'triton<3.0.0 on device with capability<8. '
-                    'Please upgrade your triton version.')
-                _handle_exception(err, 'Triton', logger)
+    _ENV_CHECKED['triton'] = True
 
 
 def check_env(device_type: str):
     """check all environment."""
-    logger = get_logger('lmdeploy')
+    logger = _logger()
     logger.info('Checking environment for PyTorch Engine.')
     check_env_deeplink(device_type)
     check_env_torch()
@@ -124,17 +173,24 @@ MAX_TRANSFORMERS_VERSION = '4.44.1'
 
 def check_awq(hf_config, device_type):
     """check awq support."""
-    logger = get_logger('lmdeploy')
+    logger = _logger()
     if device_type == 'cuda':
-        quantization_config = getattr(hf_config, 'quantization_config', dict())
+        quantization_config = getattr(hf_config, 'quantization_config', None)
+        if not quantization_config:
+            return
         quant_method = quantization_config.get('quant_method', None)
         if quant_method != 'awq':
             return
+        # only check presence, importing awq would initialize its extensions.
+        from importlib.util import find_spec
         try:
-            import awq  # noqa
+            if find_spec('awq') is None:
+                raise ModuleNotFoundError("No module named 'awq'",
+                                          name='awq')
         except Exception as e:
             _handle_exception(e, 'autoawq', logger)
 
+        # import the extension to detect ABI mismatch with torch.
         try:
             import awq_ext  # noqa
         except Exception:
@@ -144,32 +200,37 @@ def check_awq(hf_config, device_type):
                            'https://github.com/casper-hansen/AutoAWQ_kernels')
 
 
+@functools.lru_cache(maxsize=1)
+def _transformers_version():
+    """get installed transformers version and its parsed version."""
+    import transformers
+    return transformers.__version__, _version().parse(transformers.__version__)
+
+
 def check_transformers_version(model_path: str,
                                trust_remote_code: bool = True,
                                dtype: str = 'auto',
                                device_type: str = 'cuda'):
     """check transformers version."""
-    from packaging import version
-    logger = get_logger('lmdeploy')
+    logger = _logger()
 
     def __check_transformers_version():
         """check transformers version."""
         logger.debug('Checking <transformers> version.')
         trans_version = None
         try:
-            import transformers
-            trans_version = version.parse(transformers.__version__)
-            min_version = version.parse(MIN_TRANSFORMERS_VERSION)
-            max_version = version.parse(MAX_TRANSFORMERS_VERSION)
+            trans_version_str, trans_version = _transformers_version()
+            min_version = _parsed_version(MIN_TRANSFORMERS_VERSION)
+            max_version = _parsed_version(MAX_TRANSFORMERS_VERSION)
             if trans_version < min_version or trans_version > max_version:
                 logger.warning('LMDeploy requires transformers version: '
                                f'[{MIN_TRANSFORMERS_VERSION} ~ '
                                f'{MAX_TRANSFORMERS_VERSION}], '
                                'but found version: '
-                               f'{transformers.__version__}')
+                               f'{trans_version_str}')
         except Exception as e:
             _handle_exception(e, 'transformers', logger)
-        return transformers, trans_version
+        return trans_version
 
     def __check_config(trans_version):
         """check config."""
@@ -178,6 +239,9 @@ def check_transformers_version(model_path: str,
             from transformers import AutoConfig
             config = AutoConfig.from_pretrained(
                 model_path, trust_remote_code=trust_remote_code)
+            if getattr(config, 'model_type', None) in ['phi3']:
+                # same as ModelConfig.from_pretrained
+                config = AutoConfig.from_pretrained(model_path)
         except Exception as e:
             message = (
                 f'Load model config with transformers=={trans_version}'
@@ -192,7 +256,7 @@ def check_transformers_version(model_path: str,
         try:
             model_trans_version = getattr(config, 'transformers_version', None)
             if model_trans_version is not None:
-                model_trans_version = version.parse(model_trans_version)
+                model_trans_version = _version().parse(model_trans_version)
                 assert trans_version >= model_trans_version, \
                     'Version mismatch.'
         except Exception as e:
@@ -231,27 +295,39 @@ def check_transformers_version(model_path: str,
 
         return model_config
 
-    _, trans_version = __check_transformers_version()
+    trans_version = __check_transformers_version()
     config = __check_config(trans_version)
     __check_model_transformers_version(config, trans_version)
-    __check_model_dtype_support(config, device_type)
+    model_config = __check_model_dtype_support(config, device_type)
     check_awq(config, device_type)
+    return model_config
 
 
 def check_model(model_path: str,
                 trust_remote_code: bool = True,
                 dtype: str = 'auto',
                 device_type: str = 'cuda'):
-    """check model requirements."""
-    logger = get_logger('lmdeploy')
+    """check model requirements.
+
+    Returns:
+        ModelConfig: the model config built while checking, which can be
+            reused by the engine instead of loading the config again.
+    """
+    logger = _logger()
     logger.info('Checking model.')
-    check_transformers_version(model_path, trust_remote_code, dtype,
-                               device_type)
+    return check_transformers_version(model_path, trust_remote_code, dtype,
+                                      device_type)
+
+
+# adapters that have passed `check_adapter` in this process.
+_CHECKED_ADAPTERS = set()
 
 
 def check_adapter(path: str):
     """check adapter."""
-    logger = get_logger('lmdeploy')
+    if path in _CHECKED_ADAPTERS:
+        return
+    logger = _logger()
     logger.debug(f'Checking <Adapter>: {path}.')
 
     try:
@@ -265,13 +341,14 @@ def check_adapter(path: str):
             message += ('Or try remove all unexpected keywords '
                         'in `adapter_config.json`.')
         _handle_exception(e, 'Model', logger, message=message)
+    _CHECKED_ADAPTERS.add(path)
 
 
 def check_adapters(adapter_paths: List[str]):
     """check adapters."""
     if len(adapter_paths) <= 0:
         return
-    logger = get_logger('lmdeploy')
+    logger = _logger()
     logger.info('Checking adapters.')
-    for path in adapter_paths:
+    for path in dict.fromkeys(adapter_paths):
         check_adapter(path)
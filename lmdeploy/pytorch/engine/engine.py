@@ -96,8 +96,9 @@ class Engine:
         else:
             engine_config = copy.deepcopy(engine_config)
         check_env(engine_config.device_type)
-        check_model(model_path, trust_remote_code, engine_config.dtype,
-                    engine_config.device_type)
+        model_config = check_model(model_path, trust_remote_code,
+                                   engine_config.dtype,
+                                   engine_config.device_type)
         if engine_config.max_batch_size is None:
             engine_config.max_batch_size = get_max_batch_size(
                 engine_config.device_type)
@@ -135,6 +136,8 @@ class Engine:
         if not os.path.exists(model_path):
             model_path = get_model(model_path, engine_config.download_dir,
                                    engine_config.revision)
+            # the checked config might not come from the downloaded snapshot
+            model_config = None
         self.model_path = model_path
 
         if adapters is not None and len(adapters) > 0:
@@ -154,7 +157,8 @@ class Engine:
                 adapters=adapters,
                 tp=self.tp,
                 dtype=engine_config.dtype,
-                custom_module_map=engine_config.custom_module_map)
+                custom_module_map=engine_config.custom_module_map,
+                model_config=model_config)
 
         cache_config = self.model_agent.cache_config
         self.adapter_manager = self._build_adapter_manager(adapters)
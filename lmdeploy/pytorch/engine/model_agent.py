@@ -763,7 +763,8 @@ def build_model_agent(model_path: str,
                       adapters: Dict[str, str] = None,
                       tp: int = 1,
                       dtype: str = 'auto',
-                      custom_module_map: str = None):
+                      custom_module_map: str = None,
+                      model_config: ModelConfig = None):
     """create model agent.
 
     Args:
@@ -775,9 +776,12 @@ def build_model_agent(model_path: str,
         tp (int): the number of devices to be used in tensor parallelism
         dtype (str): the data type of model weights and activations
         custom_module_map (str): customized nn module map
+        model_config (ModelConfig): config of the model. Loaded from
+            `model_path` if not given.
     """
-    model_config = ModelConfig.from_pretrained(
-        model_path, trust_remote_code=trust_remote_code, dtype=dtype)
+    if model_config is None:
+        model_config = ModelConfig.from_pretrained(
+            model_path, trust_remote_code=trust_remote_code, dtype=dtype)
     model_config.custom_module_map = custom_module_map
     if tp == 1:
         model_agent = BaseModelAgent(model_path,
@@ -0,0 +1,67 @@
+from unittest import mock
+
+import pytest
+from transformers import AutoConfig, LlamaConfig, Phi3Config
+
+
+def _save_config(config_cls, path):
+    config = config_cls(hidden_size=64,
+                        intermediate_size=128,
+                        num_hidden_layers=2,
+                        num_attention_heads=4,
+                        num_key_value_heads=4,
+                        vocab_size=128,
+                        torch_dtype='float16')
+    config.save_pretrained(path)
+    return str(path)
+
+
+class TestCheckModel:
+
+    @pytest.fixture(params=[LlamaConfig, Phi3Config])
+    def model_path(self, request, tmp_path):
+        yield _save_config(request.param, tmp_path)
+
+    def test_model_config(self, model_path):
+        from lmdeploy.pytorch.check_env import check_model
+        from lmdeploy.pytorch.config import ModelConfig
+
+        model_config = check_model(model_path, dtype='auto')
+        gt = ModelConfig.from_pretrained(model_path, dtype='auto')
+        assert model_config == gt
+
+    def test_phi3_reload(self, tmp_path):
+        from lmdeploy.pytorch.check_env import check_model
+        model_path = _save_config(Phi3Config, tmp_path)
+
+        with mock.patch.object(AutoConfig,
+                               'from_pretrained',
+                               wraps=AutoConfig.from_pretrained) as load:
+            check_model(model_path, trust_remote_code=True)
+        assert load.call_args_list == [
+            mock.call(model_path, trust_remote_code=True),
+            mock.call(model_path),
+        ]
+
+
+class TestCheckAdapters:
+
+    @pytest.fixture
+    def peft_config(self):
+        import lmdeploy.pytorch.check_env as check_env
+        peft = mock.MagicMock()
+        with mock.patch.dict('sys.modules', {'peft': peft}), \
+                mock.patch.object(check_env, '_CHECKED_ADAPTERS', set()):
+            yield peft.PeftConfig
+
+    def test_check_adapters(self, peft_config):
+        from lmdeploy.pytorch.check_env import check_adapters
+
+        check_adapters(['a', 'a', 'b'])
+        assert peft_config.from_pretrained.call_args_list == [
+            mock.call('a'), mock.call('b')
+        ]
+
+        peft_config.from_pretrained.reset_mock()
+        check_adapters(['b', 'a'])
+        peft_config.from_pretrained.assert_not_called()
@@ -0,0 +1,50 @@
+from unittest import mock
+
+import pytest
+
+
+class _StopInit(Exception):
+    pass
+
+
+class TestEngineModelConfig:
+
+    @pytest.fixture
+    def patched(self):
+        from lmdeploy.pytorch.engine import engine
+        manager = mock.MagicMock()
+        manager.build_model_agent.side_effect = _StopInit
+        manager.get_model.return_value = 'snapshot_path'
+        with mock.patch.object(engine, 'check_env'), \
+                mock.patch.object(engine, 'check_model',
+                                  manager.check_model), \
+                mock.patch.object(engine, 'get_model', manager.get_model), \
+                mock.patch.object(engine, 'build_model_agent',
+                                  manager.build_model_agent):
+            yield manager
+
+    def _build_engine(self, model_path):
+        from lmdeploy.messages import PytorchEngineConfig
+        from lmdeploy.pytorch.engine.engine import Engine
+        with pytest.raises(_StopInit):
+            Engine(model_path, PytorchEngineConfig(max_batch_size=1))
+
+    def test_local_model(self, patched, tmp_path):
+        model_path = str(tmp_path)
+        self._build_engine(model_path)
+
+        patched.get_model.assert_not_called()
+        kwargs = patched.build_model_agent.call_args.kwargs
+        assert patched.build_model_agent.call_args.args == (model_path, )
+        assert kwargs['model_config'] is patched.check_model.return_value
+
+    def test_hub_model(self, patched):
+        self._build_engine('org/model')
+
+        # model is checked before the snapshot is downloaded
+        names = [c[0] for c in patched.mock_calls]
+        assert names.index('check_model') < names.index('get_model')
+        assert patched.check_model.call_args.args[0] == 'org/model'
+        kwargs = patched.build_model_agent.call_args.kwargs
+        assert patched.build_model_agent.call_args.args == ('snapshot_path', )
+        assert kwargs['model_config'] is None
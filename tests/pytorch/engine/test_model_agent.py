@@ -0,0 +1,37 @@
+from unittest import mock
+
+
+def test_build_model_agent_reuse_model_config():
+    from lmdeploy.pytorch.engine import model_agent
+
+    model_config = mock.MagicMock()
+    with mock.patch.object(model_agent.ModelConfig,
+                           'from_pretrained') as from_pretrained, \
+            mock.patch.object(model_agent, 'BaseModelAgent') as agent_cls:
+        model_agent.build_model_agent('model_path',
+                                      cache_config=None,
+                                      backend_config=None,
+                                      trust_remote_code=True,
+                                      custom_module_map='module_map',
+                                      model_config=model_config)
+    from_pretrained.assert_not_called()
+    assert agent_cls.call_args.kwargs['model_config'] is model_config
+    assert model_config.custom_module_map == 'module_map'
+
+
+def test_build_model_agent_load_model_config():
+    from lmdeploy.pytorch.engine import model_agent
+
+    with mock.patch.object(model_agent.ModelConfig,
+                           'from_pretrained') as from_pretrained, \
+            mock.patch.object(model_agent, 'BaseModelAgent') as agent_cls:
+        model_agent.build_model_agent('model_path',
+                                      cache_config=None,
+                                      backend_config=None,
+                                      trust_remote_code=True,
+                                      dtype='float16')
+    from_pretrained.assert_called_once_with('model_path',
+                                            trust_remote_code=True,
+                                            dtype='float16')
+    model_config = from_pretrained.return_value
+    assert agent_cls.call_args.kwargs['model_config'] is model_config